@@ -0,0 +1,211 @@
+import os
+import re
+import json
+import shutil
+import argparse
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from embedding_store import QuantizedEmbeddings, parse_vector, EMBEDDING_DIM
+from work_queue import LEASE_SECONDS
+
+# Local columnar copy of every embedded scholarship, for fast cold starts.
+#
+#   <dir>/embeddings.npy   rows x 768, unit-normalised, opened with mmap
+#                          (float32, float16, or int8 + <dir>/scales.npy)
+#   <dir>/ids.npy          scholarship ids, same order
+#   <dir>/columns.json     {"title": [...], "url": [...], ...} same order
+#   <dir>/manifest.json    row count, dtype + embedded_at watermark for delta refreshes
+#
+# Needs the embedded_at trigger from sql/catalogue_snapshot.sql.
+
+DEFAULT_DIR = "catalogue_snapshot"
+COLUMNS = ["title", "url", "deadline", "is_active", "content_snippet"]
+PAGE_SIZE = 1000
+# Re-read this far behind the watermark: a row stamped earlier can commit after
+# a later one was already read (e.g. an embedder holding its lease).
+REFRESH_OVERLAP_SECONDS = LEASE_SECONDS
+
+class CatalogueSnapshot:
+    def __init__(self, path, ids, embeddings, columns, manifest, scales=None):
+        self.path = path
+        self.ids = ids
+        self.embeddings = embeddings
+        self.scales = scales
+        self.columns = columns
+        self.manifest = manifest
+        self._index = None
+        self._positions = None
+
+    @classmethod
+    def open(cls, path=DEFAULT_DIR):
+        """Memory-maps the matrix: nothing is copied into RAM until it is read."""
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, "columns.json"), encoding="utf-8") as f:
+            columns = json.load(f)
+        ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r")
+        embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        scales_path = os.path.join(path, "scales.npy")
+        scales = np.load(scales_path, mmap_mode="r") if os.path.exists(scales_path) else None
+        return cls(path, ids, embeddings, columns, manifest, scales)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def age_hours(self):
+        created_at = _parse_timestamp(self.manifest["created_at"])
+        return (datetime.now(timezone.utc) - created_at).total_seconds() / 3600
+
+    def row(self, i):
+        record = {name: values[i] for name, values in self.columns.items()}
+        record["id"] = self.ids[i].item()
+        return record
+
+    def index(self):
+        """A search index over the mapped matrix (no copy)."""
+        if self._index is None:
+            self._index = QuantizedEmbeddings(self.ids.tolist(), self.embeddings, self.scales)
+            self._positions = {sid: i for i, sid in enumerate(self._index.ids)}
+        return self._index
+
+    def search(self, query_vector, match_threshold=0.5, match_count=5):
+        """Same shape as the match_scholarships RPC rows."""
+        results = []
+        for sid, similarity in self.index().search(query_vector, match_count, match_threshold):
+            record = self.row(self._positions[sid])
+            record["similarity"] = similarity
+            results.append(record)
+        return results
+
+# --- EXPORT / REFRESH ---
+
+def _parse_timestamp(value):
+    """Postgres timestamps ('...T03:20:50.9069+00:00'), padded for Python 3.9's fromisoformat."""
+    value = value.replace("Z", "+00:00")
+    value = re.sub(r"\.(\d+)", lambda m: "." + m.group(1)[:6].ljust(6, "0"), value)
+    return datetime.fromisoformat(value)
+
+def _fetch_pages(query_fn):
+    start = 0
+    while True:
+        rows = query_fn().range(start, start + PAGE_SIZE - 1).execute().data
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        start += PAGE_SIZE
+
+def fetch_embedded_rows(supabase, since=None):
+    def query():
+        q = supabase.table("scholarships") \
+            .select(", ".join(["id", "embedding", "embedded_at"] + COLUMNS)) \
+            .not_.is_("embedding", "null")
+        if since:
+            q = q.gte("embedded_at", since)
+        return q.order("id")
+    return list(_fetch_pages(query))
+
+def fetch_live_ids(supabase):
+    def query():
+        return supabase.table("scholarships").select("id").not_.is_("embedding", "null").order("id")
+    return {row["id"] for row in _fetch_pages(query)}
+
+def _write(path, ids, store, columns, watermark):
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    np.save(os.path.join(tmp_path, "ids.npy"), np.asarray(ids))
+    np.save(os.path.join(tmp_path, "embeddings.npy"), store.data.reshape(-1, EMBEDDING_DIM))
+    if store.scales is not None:
+        np.save(os.path.join(tmp_path, "scales.npy"), store.scales)
+    with open(os.path.join(tmp_path, "columns.json"), "w", encoding="utf-8") as f:
+        json.dump(columns, f)
+    with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "rows": len(ids),
+            "dim": EMBEDDING_DIM,
+            "dtype": store.dtype,
+            "watermark": watermark,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }, f)
+
+    # Swap directories. Readers that already mapped the old files keep working.
+    old_path = path + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+def _to_store(rows, dtype):
+    ids = [r["id"] for r in rows]
+    vectors = np.asarray([parse_vector(r["embedding"]) for r in rows], dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+    columns = {name: [r.get(name) for r in rows] for name in COLUMNS}
+    return ids, QuantizedEmbeddings.from_vectors(ids, vectors, dtype=dtype), columns
+
+def _watermark(rows, previous=None):
+    stamps = [r["embedded_at"] for r in rows if r.get("embedded_at")]
+    if previous:
+        stamps.append(previous)  # Overlap re-reads must never move it backwards
+    return max(stamps, key=_parse_timestamp) if stamps else None
+
+def export(supabase, path=DEFAULT_DIR, dtype="float32"):
+    """dtype 'float16' or 'int8' shrinks the matrix 2x / 4x (see embedding_store.py)."""
+    print(f"📦 Exporting catalogue to {path} ({dtype})...")
+    rows = fetch_embedded_rows(supabase)
+    ids, store, columns = _to_store(rows, dtype)
+    _write(path, ids, store, columns, _watermark(rows))
+    print(f"✅ Snapshot written: {len(ids)} scholarships ({store.nbytes / 1e6:.1f} MB of vectors).")
+
+def refresh(supabase, path=DEFAULT_DIR, dtype=None):
+    """Applies only rows embedded since the last snapshot, and drops deleted ones."""
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        return export(supabase, path, dtype or "float32")
+
+    old = CatalogueSnapshot.open(path)
+    watermark = old.manifest.get("watermark")
+    old_dtype = old.manifest.get("dtype", "float32")
+    if not watermark or (dtype and dtype != old_dtype):
+        return export(supabase, path, dtype or old_dtype)
+
+    since = (_parse_timestamp(watermark) - timedelta(seconds=REFRESH_OVERLAP_SECONDS)).isoformat()
+    print(f"🔄 Refreshing {path} (changes since {since})...")
+    delta = fetch_embedded_rows(supabase, since=since)
+    live_ids = fetch_live_ids(supabase)
+    # The overlap window re-reads rows we already have; they are replaced, not duplicated
+    delta_ids = {r["id"] for r in delta}
+
+    old_ids = old.ids.tolist()
+    keep = [i for i, sid in enumerate(old_ids) if sid in live_ids and sid not in delta_ids]
+    new_ids, new_store, new_columns = _to_store(delta, old_dtype)
+
+    ids = [old_ids[i] for i in keep] + new_ids
+    scales = None
+    if old.scales is not None:
+        scales = np.concatenate([old.scales[keep], new_store.scales])
+    store = QuantizedEmbeddings(ids, np.concatenate([old.embeddings[keep], new_store.data]), scales)
+    columns = {name: [old.columns[name][i] for i in keep] + new_columns[name] for name in COLUMNS}
+    _write(path, ids, store, columns, _watermark(delta, watermark))
+
+    removed = len(old_ids) - len(keep) - len(delta_ids & set(old_ids))
+    added = len(delta_ids - set(old_ids))
+    print(f"✅ Snapshot refreshed: +{added} new, {len(delta) - added} re-read, -{removed} removed, {len(ids)} total.")
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    parser = argparse.ArgumentParser(description="Local catalogue snapshot")
+    parser.add_argument("command", nargs="?", default="refresh", choices=["export", "refresh"])
+    parser.add_argument("dir", nargs="?", default=DEFAULT_DIR)
+    parser.add_argument("--dtype", choices=["float32", "float16", "int8"],
+                        help="Vector storage (default: float32, or the existing snapshot's)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(supabase, args.dir, args.dtype or "float32")
+    else:
+        refresh(supabase, args.dir, args.dtype)
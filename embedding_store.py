@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+# Compact storage for text-embedding-004 vectors (768 dims).
+# A Python list of 768 floats costs ~25 KB; float16 costs 1.5 KB and int8 ~0.8 KB.
+
+EMBEDDING_DIM = 768
+SEARCH_CHUNK = 4096  # Rows upcast to float32 at a time during search
+
+def parse_vector(value):
+    """pgvector columns come back from Supabase as a '[0.1,0.2,...]' string."""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+class QuantizedEmbeddings:
+    """
+    Unit-normalised vectors stored in ONE contiguous array.
+    dtype 'float32' | 'float16' | 'int8' (int8 keeps a per-vector scale).
+    """
+
+    def __init__(self, ids, data, scales=None):
+        self.ids = list(ids)
+        self.data = data
+        self.scales = scales
+
+    @classmethod
+    def from_vectors(cls, ids, vectors, dtype="int8"):
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.maximum(norms, 1e-12)
+
+        if dtype == "int8":
+            # Symmetric quantisation: largest component of each vector maps to 127
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales = np.maximum(scales, 1e-12).astype(np.float32)
+            data = np.round(matrix / scales[:, None]).astype(np.int8)
+            return cls(ids, data, scales)
+        if dtype in ("float16", "float32"):
+            return cls(ids, matrix.astype(dtype))
+        raise ValueError(f"Unsupported dtype: {dtype}")
+
+    @property
+    def dtype(self):
+        return str(self.data.dtype)
+
+    @property
+    def nbytes(self):
+        scales = self.scales.nbytes if self.scales is not None else 0
+        return self.data.nbytes + scales
+
+    def __len__(self):
+        return len(self.ids)
+
+    def similarities(self, query_vector):
+        """Cosine similarity of the query against every stored vector."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(np.linalg.norm(query), 1e-12)
+
+        out = np.empty(len(self.ids), dtype=np.float32)
+        # Chunked so we never hold a full float32 copy of the matrix
+        for start in range(0, len(self.ids), SEARCH_CHUNK):
+            block = self.data[start:start + SEARCH_CHUNK]
+            scores = block.astype(np.float32) @ query
+            if self.scales is not None:
+                scores *= self.scales[start:start + SEARCH_CHUNK]
+            out[start:start + SEARCH_CHUNK] = scores
+        return out
+
+    def search(self, query_vector, k=5, threshold=None):
+        """Returns [(id, similarity), ...] best first."""
+        if not self.ids:
+            return []
+        scores = self.similarities(query_vector)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self.ids[i], float(scores[i]))
+            for i in top
+            if threshold is None or scores[i] >= threshold
+        ]
+
+    def save(self, path):
+        arrays = {"ids": np.asarray(self.ids), "data": self.data}
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            scales = f["scales"] if "scales" in f else None
+            return cls(f["ids"].tolist(), f["data"], scales)
+
+# --- RECALL vs MEMORY BENCHMARK ---
+
+def fetch_corpus(supabase, page_size=1000):
+    """Pages every stored embedding out of the scholarships table."""
+    ids, vectors = [], []
+    start = 0
+    while True:
+        response = supabase.table("scholarships") \
+            .select("id, embedding") \
+            .not_.is_("embedding", "null") \
+            .range(start, start + page_size - 1) \
+            .execute()
+        rows = response.data
+        for row in rows:
+            ids.append(row["id"])
+            vectors.append(parse_vector(row["embedding"]))
+        if len(rows) < page_size:
+            return ids, vectors
+        start += page_size
+
+def benchmark(ids, vectors, num_queries=200, k=10, seed=0):
+    """
+    Compares float16 / int8 against exact float32 search.
+    Queries are stored vectors with a little noise (stand-ins for real profiles).
+    """
+    rng = np.random.default_rng(seed)
+    base = np.asarray(vectors, dtype=np.float32)
+    picks = rng.choice(len(base), size=min(num_queries, len(base)), replace=False)
+    queries = base[picks] + rng.normal(0, 0.01, size=(len(picks), base.shape[1])).astype(np.float32)
+
+    exact = QuantizedEmbeddings.from_vectors(ids, base, dtype="float32")
+    truth = [{i for i, _ in exact.search(q, k)} for q in queries]
+    list_bytes = len(ids) * (sys.getsizeof([0.0] * EMBEDDING_DIM) + EMBEDDING_DIM * sys.getsizeof(0.0))
+
+    print(f"📊 {len(ids)} vectors, {len(queries)} queries, recall@{k}")
+    print(f"   {'python list':<12} {list_bytes / 1e6:8.2f} MB")
+
+    for dtype in ("float32", "float16", "int8"):
+        store = QuantizedEmbeddings.from_vectors(ids, base, dtype=dtype)
+        start = time.time()
+        found = [{i for i, _ in store.search(q, k)} for q in queries]
+        elapsed = (time.time() - start) / len(queries)
+        recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+        print(f"   {dtype:<12} {store.nbytes / 1e6:8.2f} MB   recall {recall:.4f}   {elapsed * 1000:.2f} ms/query")
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+    print("📦 Loading corpus embeddings...")
+    corpus_ids, corpus_vectors = fetch_corpus(supabase)
+    if not corpus_ids:
+        print("⚠️ No embeddings found. Run the embedder first.")
+    else:
+        benchmark(corpus_ids, corpus_vectors)
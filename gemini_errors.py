@@ -0,0 +1,14 @@
+from google.api_core import exceptions as google_exceptions
+
+# Gemini errors that say nothing about the input itself: worth retrying later.
+# Anything else (InvalidArgument, PermissionDenied...) will fail the same way again.
+
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,   # 429 quota / rate limit
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
@@ -0,0 +1,78 @@
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+
+# Content-addressed store of raw HTTP responses.
+#
+#   <root>/objects/ab/abcdef....gz   gzip'd body, named by its sha256
+#   <root>/index.jsonl               one line per fetch: url, status, headers, sha256, fetched_at
+#
+# Identical bodies (mirrors, re-fetches of unchanged pages) are stored once.
+
+class HttpArchive:
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.jsonl")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest + ".gz")
+
+    def put(self, url, status, headers, body):
+        """Stores one response and returns the sha256 of its body."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so a crash (or a second worker) never leaves half a file.
+            # Unique temp name per write: fetch threads can store the same body at once.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            try:
+                with gzip.open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if not os.path.exists(path):
+                    raise
+                # Another writer stored the same body first
+
+        record = {
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "sha256": digest,
+            "fetched_at": datetime.now(timezone.utc).isoformat()
+        }
+        # One short append per fetch, safe with several scraper processes
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return digest
+
+    def get_body(self, digest):
+        with gzip.open(self._object_path(digest), "rb") as f:
+            return f.read()
+
+    def entries(self, latest_only=True):
+        """Index records, oldest first. By default only the newest fetch of each URL."""
+        if not os.path.exists(self.index_path):
+            return []
+        records = []
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # Torn last line from a crash
+        if not latest_only:
+            return records
+        latest = {}
+        for record in records:
+            latest[record["url"]] = record
+        return list(latest.values())
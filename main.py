@@ -1,14 +1,19 @@
 import streamlit as st
 import os
+from collections import OrderedDict
 import google.generativeai as genai
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from pypdf import PdfReader
+from standing_matches import save_profile, get_profiles, get_new_matches, mark_seen
+from catalogue_snapshot import CatalogueSnapshot
 
 # --- 1. SETUP & CONFIG ---
 st.set_page_config(page_title="HunterAI", page_icon="🎓", layout="wide")
 load_dotenv()
 
+FULL_TEXT_CACHE_SIZE = 200  # Scholarship texts kept per session (~15 KB each)
+
 # Initialize connection
 @st.cache_resource
 def init_connections():
@@ -46,6 +51,23 @@ def find_best_model():
 
 ACTIVE_MODEL_NAME = find_best_model()
 
+SNAPSHOT_MAX_AGE_HOURS = float(os.getenv("CATALOGUE_SNAPSHOT_MAX_AGE_HOURS", "24"))
+
+@st.cache_resource(ttl=3600)  # Picks up refreshed snapshots hourly
+def load_snapshot():
+    """Local catalogue (python catalogue_snapshot.py refresh). Falls back to the DB if missing."""
+    try:
+        return CatalogueSnapshot.open(os.getenv("CATALOGUE_SNAPSHOT_DIR", "catalogue_snapshot"))
+    except Exception:
+        return None
+
+def get_fresh_snapshot():
+    """The local catalogue, unless it is too old to include recent scholarships."""
+    snapshot = load_snapshot()
+    if snapshot and snapshot.age_hours() <= SNAPSHOT_MAX_AGE_HOURS:
+        return snapshot
+    return None
+
 def extract_text_from_pdf(uploaded_file):
     try:
         pdf_reader = PdfReader(uploaded_file)
@@ -68,6 +90,10 @@ def get_embedding(text):
 def semantic_search(query_text):
     try:
         query_vector = get_embedding(query_text)
+        st.session_state.query_vector = query_vector  # Re-used if the profile is saved for alerts
+        snapshot = get_fresh_snapshot()
+        if snapshot:
+            return snapshot.search(query_vector, match_threshold=0.50, match_count=15)
         response = supabase.rpc("match_scholarships", {
             "query_embedding": query_vector,
             "match_threshold": 0.50,
@@ -78,6 +104,34 @@ def semantic_search(query_text):
         st.error(f"Search Error: {e}")
         return []
 
+# --- FULL TEXT CACHE (No DB round trip when drafting) ---
+def cache_full_text(scholarship_id, full_text):
+    cache = st.session_state.full_text_cache
+    cache[scholarship_id] = full_text or ""
+    cache.move_to_end(scholarship_id)
+    while len(cache) > FULL_TEXT_CACHE_SIZE:
+        cache.popitem(last=False)  # Evict the least recently used
+
+def prefetch_full_texts(scholarship_ids):
+    """Loads full_text for a whole result set in ONE query."""
+    missing = [i for i in scholarship_ids if i not in st.session_state.full_text_cache]
+    if not missing:
+        return
+    try:
+        response = supabase.table("scholarships").select("id, full_text").in_("id", missing).execute()
+        for row in response.data:
+            cache_full_text(row['id'], row['full_text'])
+    except Exception as e:
+        st.warning(f"Prefetch Error: {e}")
+
+def get_full_text(scholarship_id):
+    cache = st.session_state.full_text_cache
+    if scholarship_id not in cache:
+        prefetch_full_texts([scholarship_id])  # Fallback (evicted or prefetch failed)
+    if scholarship_id in cache:
+        cache.move_to_end(scholarship_id)
+    return cache.get(scholarship_id, "")
+
 # --- EVOLVED GHOSTWRITER (Adversarial Loop) ---
 def generate_essay(user_profile, scholarship_title, scholarship_data):
     model = genai.GenerativeModel(ACTIVE_MODEL_NAME)
@@ -183,6 +237,29 @@ def delete_from_vault(saved_id):
     except Exception as e:
         st.error(f"Delete Error: {e}")
 
+# --- STANDING MATCHES (New matches since last visit) ---
+def save_profile_for_alerts(name):
+    try:
+        save_profile(supabase, name, st.session_state.user_profile,
+                     st.session_state.query_vector, st.session_state.search_results)
+        st.toast("🔔 Profile saved! New matches will appear in the sidebar.")
+        st.rerun()
+    except Exception as e:
+        st.error(f"Alert Save Error: {e}")
+
+def get_alerts():
+    try:
+        return [(p, get_new_matches(supabase, p['id'], p['last_seen_at'])) for p in get_profiles(supabase)]
+    except:
+        return []
+
+def dismiss_alerts(profile_id):
+    try:
+        mark_seen(supabase, profile_id)
+        st.rerun()
+    except Exception as e:
+        st.error(f"Alert Error: {e}")
+
 def get_stats():
     try:
         response = supabase.table("scholarships").select("id", count="exact").execute()
@@ -199,6 +276,8 @@ if "search_results" not in st.session_state:
     st.session_state.search_results = []
 if "user_profile" not in st.session_state:
     st.session_state.user_profile = ""
+if "full_text_cache" not in st.session_state:
+    st.session_state.full_text_cache = OrderedDict()
 
 # --- SIDEBAR: THE VAULT & STATS ---
 with st.sidebar:
@@ -213,6 +292,8 @@ with st.sidebar:
         for saved in vault_items:
             sch = saved['scholarships']
             if sch:
+                # Vault query already joined the text, keep it for later drafts
+                cache_full_text(sch['id'], sch['full_text'])
                 with st.expander(f"📌 {sch['title'][:25]}..."):
                     st.markdown(f"[🔗 Link]({sch['url']})")
                     if st.button("🗑️ Remove", key=f"del_{saved['id']}"):
@@ -228,6 +309,25 @@ with st.sidebar:
     else:
         st.info("No saved scholarships yet.")
 
+    st.divider()
+    st.subheader("🔔 Standing Matches")
+    alerts = get_alerts()
+
+    if alerts:
+        for profile, new_matches in alerts:
+            with st.expander(f"🔔 {profile['name'][:25]} ({len(new_matches)} new)"):
+                for match in new_matches:
+                    sch = match['scholarships']
+                    if sch:
+                        st.markdown(f"[{sch['title'][:40]}]({sch['url']}) ({int(match['similarity']*100)}%)")
+                if new_matches:
+                    if st.button("✅ Mark as seen", key=f"seen_{profile['id']}"):
+                        dismiss_alerts(profile['id'])
+                else:
+                    st.caption("Nothing new since your last visit.")
+    else:
+        st.info("Save a profile to get new matches automatically.")
+
 # --- MAIN AREA ---
 
 # RESUME UPLOADER
@@ -253,6 +353,7 @@ if st.button("Find Matches", type="primary"):
     else:
         st.session_state.user_profile = user_query
         st.session_state.search_results = semantic_search(user_query)
+        prefetch_full_texts([item['id'] for item in st.session_state.search_results])
 
 # Display Results
 if st.session_state.search_results:
@@ -269,8 +370,7 @@ if st.session_state.search_results:
                 btn_col1, btn_col2 = st.columns(2)
                 with btn_col1:
                     if st.button("✍️ Write Application", key=f"btn_{item['id']}"):
-                        db_data = supabase.table("scholarships").select("full_text").eq("id", item['id']).execute()
-                        full_text = db_data.data[0]['full_text'] if db_data.data else ""
+                        full_text = get_full_text(item['id'])
                         if full_text:
                             draft = generate_essay(st.session_state.user_profile, item['title'], full_text)
                             st.subheader("Stealth Draft:")
@@ -284,6 +384,15 @@ if st.session_state.search_results:
             with col2:
                 st.metric("Relevance", f"{int(item['similarity']*100)}%")
 
+    # STANDING MATCH SIGN-UP
+    with st.form("alert_form"):
+        alert_name = st.text_input("Profile name", placeholder="e.g. Civil Engineering Masters")
+        if st.form_submit_button("🔔 Alert me about new matches"):
+            if alert_name and "query_vector" in st.session_state:
+                save_profile_for_alerts(alert_name)
+            else:
+                st.warning("Give this profile a name first.")
+
 elif user_query and not st.session_state.search_results:
     st.info("Click 'Find Matches' to search.")
 
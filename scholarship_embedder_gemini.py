@@ -1,8 +1,13 @@
 import os
 import time
+import argparse
 import google.generativeai as genai
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from work_queue import make_worker_id, claim_batch, complete, release, requeue
+from scholarship_quality_filter import assess
+from standing_matches import update_standing_matches
+from gemini_errors import TRANSIENT_ERRORS
 
 # 1. Setup & Config
 load_dotenv()
@@ -18,10 +23,17 @@ if not SUPABASE_URL or not GEMINI_API_KEY:
 # Initialize connections
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 genai.configure(api_key=GEMINI_API_KEY)
+WORKER_ID = make_worker_id("embed")
+
+# TRANSIENT_ERRORS say nothing about the row itself: retry later, don't burn an attempt
+BACKOFF_START = 30      # Seconds to wait after the first rate-limit/network error
+BACKOFF_MAX = 300
+MAX_TRANSIENT_IN_A_ROW = 3  # Then hand the rest of the batch back and stop
 
 def generate_embedding(text):
     """
     Turns text into a vector using Gemini.
+    Returns None for bad content; raises TRANSIENT_ERRORS so the caller can back off.
     """
     try:
         # Clean text slightly to save tokens
@@ -33,49 +45,86 @@ def generate_embedding(text):
             task_type="retrieval_document"
         )
         return result['embedding']
+    except TRANSIENT_ERRORS:
+        raise
     except Exception as e:
         print(f"   ⚠️ Embedding Error: {e}")
         return None
 
-def main():
-    print("🧠 Embedder (with Rate Limit Guard) Initialized...")
-    
-    # 2. Fetch scholarships that have Text but NO Memory (embedding is null)
-    # We increase the limit slightly since we now have safety brakes
-    response = supabase.table("scholarships") \
-        .select("id, title, full_text") \
-        .is_("embedding", "null") \
-        .neq("full_text", "null") \
-        .limit(50) \
-        .execute()
-        
-    tasks = response.data
-    
-    if not tasks:
-        print("✅ All readable scholarships have been memorized!")
-        return
+def main(drain=False):
+    print(f"🧠 Embedder (with Rate Limit Guard) Initialized as {WORKER_ID}...")
+
+    while True:
+        # 2. Claim scholarships that have Text but NO Memory (embedding is null)
+        # The lease stops other embedder workers from spending quota on the same rows
+        tasks = claim_batch(supabase, "embed", WORKER_ID, limit=50)
 
-    print(f"📚 Found {len(tasks)} scholarships to memorize...")
+        if not tasks:
+            print("✅ All readable scholarships have been memorized!")
+            return
 
-    for item in tasks:
+        print(f"📚 Claimed {len(tasks)} scholarships to memorize...")
+        skipped, rate_limited = process_batch(tasks)
+        if skipped:
+            print(f"\n💰 Quality guard skipped {skipped} junk pages ({skipped} embedding calls saved).")
+
+        if not drain or rate_limited:
+            return
+
+def process_batch(tasks):
+    skipped = 0
+    rate_limited = False
+    new_vectors = []
+    backoff = BACKOFF_START
+    transient_in_a_row = 0
+    for position, item in enumerate(tasks):
         print(f"\n⚡ Memorizing: {item['title'][:40]}...")
+
+        # Backstop for rows the Quality Filter stage hasn't scored yet
+        if item.get('quality_score') is None:
+            quality = assess(item['full_text'])
+            if quality["is_junk"]:
+                print(f"   🚫 Junk page ({', '.join(quality['reasons']) or 'low score'}). Not embedding.")
+                complete(supabase, item['id'], WORKER_ID, {"quality_score": quality["score"], "is_junk": True})
+                skipped += 1
+                continue
         
         # A. Generate the Vector
-        vector = generate_embedding(item['full_text'])
-        
+        try:
+            vector = generate_embedding(item['full_text'])
+        except TRANSIENT_ERRORS as e:
+            # Not the row's fault: give it back without counting the attempt
+            print(f"   ⏸️ Temporary Gemini Error: {e}")
+            requeue(supabase, item, "embed", WORKER_ID)
+            transient_in_a_row += 1
+            if transient_in_a_row >= MAX_TRANSIENT_IN_A_ROW:
+                rest = tasks[position + 1:]
+                print(f"   🛑 Still failing. Handing back {len(rest)} rows for a later run.")
+                for other in rest:
+                    requeue(supabase, other, "embed", WORKER_ID)
+                rate_limited = True
+                break
+            print(f"   ⏳ Backing off for {backoff} seconds...")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+            continue
+
+        transient_in_a_row = 0
+        backoff = BACKOFF_START
         if vector:
             # B. Save to Database
             try:
-                supabase.table("scholarships") \
-                    .update({"embedding": vector}) \
-                    .eq("id", item['id']) \
-                    .execute()
-                print("   ✅ Saved to memory.")
+                if complete(supabase, item['id'], WORKER_ID, {"embedding": vector}):
+                    print("   ✅ Saved to memory.")
+                    new_vectors.append((item['id'], vector))
+                else:
+                    print("   ⚠️ Lease lost (another worker took over).")
             except Exception as e:
                 print(f"   ❌ DB Error: {e}")
         else:
-            # If embedding failed (e.g., text too messy), skip it for now
+            # If embedding failed (e.g., text too messy), hand it back for a later attempt
             print("   ⚠️ Skipped.")
+            release(supabase, item['id'], WORKER_ID)
 
         # --- THE SAFETY BRAKE ---
         # Gemini Free Tier Limit: ~15 requests per minute.
@@ -83,5 +132,17 @@ def main():
         print("   ⏳ Cooling down for 4 seconds...")
         time.sleep(4)
 
+    # Score ONLY this batch's new vectors against saved profiles
+    try:
+        added = update_standing_matches(supabase, new_vectors)
+        if added:
+            print(f"\n🔔 {added} new matches for saved profiles.")
+    except Exception as e:
+        print(f"   ⚠️ Standing Match Error: {e}")
+    return skipped, rate_limited
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="HunterAI Embedder")
+    parser.add_argument("--drain", action="store_true", help="Keep claiming batches until the queue is empty")
+    args = parser.parse_args()
+    main(drain=args.drain)
@@ -0,0 +1,222 @@
+import io
+import os
+import signal
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from bs4 import BeautifulSoup
+from pypdf import PdfReader
+import dateparser # The Date Reader
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+# Pure text extraction (no network, no database).
+# Shared by the live scraper and the archive replay.
+
+EXTRACT_TIMEOUT = 60      # Seconds one document may take
+EXTRACT_MEMORY_MB = 1024  # Address-space cap per extraction process
+
+def extract_text_from_pdf(pdf_bytes):
+    try:
+        text = ""
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        for i, page in enumerate(reader.pages):
+            if i > 5: break 
+            text += page.extract_text() + "\n"
+        return text
+    except Exception:
+        return None
+
+def find_deadline(text):
+    """
+    Scans text for dates near keywords like 'Deadline'
+    """
+    if not text: return None
+    
+    # Keywords to look for
+    keywords = ["deadline", "closing date", "due date", "closes on", "applications close"]
+    text_lower = text.lower()
+    
+    for word in keywords:
+        if word in text_lower:
+            try:
+                # Find the keyword position
+                start = text_lower.find(word)
+                # Grab a snippet of text AFTER the keyword (e.g., "Deadline: Jan 5")
+                # We grab 50 chars to be safe
+                snippet = text[start:start+60]
+                
+                # Ask dateparser to find a date in that mess
+                found_date = dateparser.parse(
+                    snippet, 
+                    settings={'PREFER_DATES_FROM': 'future', 'DATE_ORDER': 'DMY'}
+                )
+                
+                if found_date:
+                    return found_date
+            except Exception:
+                continue
+    return None
+
+def is_pdf(content_type, url):
+    return 'pdf' in (content_type or '').lower() or url.endswith('.pdf')
+
+def extract_content(body, content_type, url):
+    """Turns a raw HTTP body into plain text (PDF or HTML)."""
+    if is_pdf(content_type, url):
+        return extract_text_from_pdf(body)
+
+    soup = BeautifulSoup(body, 'html.parser')
+    for script in soup(["script", "style", "nav", "footer"]):
+        script.decompose()
+    return ' '.join(soup.get_text(separator=' ').split())
+
+def extract_document(body, content_type, url):
+    """Extraction + deadline in one call, so the pool does all CPU work."""
+    content = extract_content(body, content_type, url)
+    return content, find_deadline(content) if content else None
+
+# --- PROCESS POOL (Bad documents kill a worker, not the run) ---
+
+class ExtractionTimeout(BaseException):
+    """BaseException, so `except Exception` blocks in parsers can't swallow it."""
+
+_timed_out = False
+
+def _raise_timeout(signum, frame):
+    global _timed_out
+    _timed_out = True
+    signal.alarm(1)  # Keep firing in case a bare `except:` swallowed this one
+    raise ExtractionTimeout()
+
+def _init_worker(memory_mb):
+    if resource and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+def _run_with_timeout(timeout, fn, *args):
+    global _timed_out
+    _timed_out = False
+    if hasattr(signal, "SIGALRM"):
+        signal.alarm(timeout)
+    try:
+        result = fn(*args)
+    finally:
+        if hasattr(signal, "SIGALRM"):
+            signal.alarm(0)
+    if _timed_out:
+        raise ExtractionTimeout()  # The job caught the alarm and carried on
+    return result
+
+def _pool_context():
+    # Never fork: the scraper has fetch threads running (deadlock risk) and a
+    # forked child would inherit the parent's address space, eating into RLIMIT_AS.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+class ExtractionPool:
+    """
+    ProcessPoolExecutor with a per-job timeout and memory cap.
+    Jobs that time out, run out of memory or crash their worker give None.
+    """
+
+    def __init__(self, workers=None, timeout=EXTRACT_TIMEOUT, memory_mb=EXTRACT_MEMORY_MB):
+        self.workers = workers or os.cpu_count()
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._pool = self._new_pool(self.workers)
+        self._jobs = {}  # future -> (seq, fn, args)
+        self._seq = itertools.count()
+        self._solo_pools = []
+
+    def _new_pool(self, workers):
+        return ProcessPoolExecutor(workers, mp_context=_pool_context(),
+                                   initializer=_init_worker, initargs=(self.memory_mb,))
+
+    def _restart(self):
+        self._pool.shutdown(wait=False)
+        self._pool = self._new_pool(self.workers)
+
+    def submit(self, fn, *args):
+        """fn must be a module-level function (it is pickled to the worker)."""
+        try:
+            future = self._pool.submit(_run_with_timeout, self.timeout, fn, *args)
+        except BrokenProcessPool:
+            self._restart()
+            future = self._pool.submit(_run_with_timeout, self.timeout, fn, *args)
+        self._jobs[future] = (next(self._seq), fn, args)
+        return future
+
+    def _submit_isolated(self, fn, args):
+        # A one-worker pool of its own: if this job crashes again, it only takes itself down
+        solo = self._new_pool(1)
+        self._solo_pools.append(solo)
+        future = solo.submit(_run_with_timeout, self.timeout, fn, *args)
+        self._jobs[future] = (next(self._seq), fn, args)
+        return future
+
+    def results(self, futures):
+        """Yields (future, result) as jobs finish. `future` is always the one submit() returned."""
+        original = {future: future for future in futures}  # live future -> caller's future
+        isolated = set()
+
+        while original:
+            crashed = []
+            for live in as_completed(list(original)):
+                future = original.pop(live)
+                seq, fn, args = self._jobs.pop(live)
+                try:
+                    yield future, live.result()
+                except BrokenProcessPool:
+                    if live in isolated:
+                        yield future, None  # Crashed on its own: this is the bad document
+                    else:
+                        crashed.append((seq, future, fn, args))
+                except (Exception, ExtractionTimeout):
+                    yield future, None
+
+            if crashed:
+                # The pool hands out jobs in submission order, so the ones that were
+                # running when it broke are the earliest unfinished ones. Only those run
+                # alone; the rest go back to the full pool, which submit() restarts.
+                # Every break isolates at least one job, so this always finishes.
+                crashed.sort(key=lambda job: job[0])
+                suspects = self.workers  # At most one running job per worker
+                resubmitted = 0
+                for i, (_, future, fn, args) in enumerate(crashed):
+                    if i < suspects:
+                        live = self._submit_isolated(fn, args)
+                        isolated.add(live)
+                    else:
+                        live = self.submit(fn, *args)
+                        resubmitted += 1
+                    original[live] = future
+                print(f"      💥 Extraction worker crashed. Isolating {len(crashed) - resubmitted} "
+                      f"in-flight documents, resubmitting {resubmitted} to the pool...")
+
+        self._close_solo_pools()
+
+    def _close_solo_pools(self):
+        for solo in self._solo_pools:
+            solo.shutdown(wait=False)
+        self._solo_pools = []
+
+    def shutdown(self):
+        self._close_solo_pools()
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -2,6 +2,9 @@ import os
 import requests
 import random
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -17,6 +20,69 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 # Initialize Supabase
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Quota Savers
+DATE_RESTRICT = 'y1'        # Freshness Filter (Last 1 Year)
+CACHE_TTL_DAYS = 7          # Re-use identical query responses for a week
+MAX_PAGES = 3               # Never go deeper than results 21-30
+DEEP_PAGE_NEW_SHARE = 0.5   # Only fetch the next page if >= 50% of this page was new
+
+# Parallel Hunt
+HUNT_WORKERS = 4                                         # Queries in flight at once
+CSE_QPS = float(os.getenv("CSE_QPS", "1.5"))             # CSE allows ~100 queries/minute
+QUERY_BUDGET = int(os.getenv("HUNT_QUERY_BUDGET", "100"))  # Live CSE calls per run (free tier: 100/day)
+DORKS_PER_TOPIC = 3                                      # Random strategies per topic
+
+class QueryBudget:
+    """Live CSE calls left this run, shared by all workers. Cache hits are free."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self):
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def exhausted(self):
+        with self._lock:
+            return self.used >= self.limit
+
+class SeenLinks:
+    """URLs claimed this run, so two parallel queries never save (or count) the same one."""
+
+    def __init__(self):
+        self._links = set()
+        self._lock = threading.Lock()
+
+    def claim(self, items):
+        fresh = []
+        with self._lock:
+            for item in items:
+                if item.get('link') not in self._links:
+                    self._links.add(item.get('link'))
+                    fresh.append(item)
+        return fresh
+
+class RateLimiter:
+    """Spaces calls 1/qps apart across all threads."""
+
+    def __init__(self, qps):
+        self.interval = 1.0 / qps
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        time.sleep(max(slot - now, 0))
+
 def get_search_terms():
     """Fetches active topics (e.g. 'Aerospace Engineering') from the database"""
     try:
@@ -88,18 +154,114 @@ def get_dork_templates():
 
     return list(set(all_dorks))
     
-def google_search(query):
+def google_search(query, start=1):
     url = "https://www.googleapis.com/customsearch/v1"
     params = {
         'q': query,
         'key': GOOGLE_API_KEY,
         'cx': SEARCH_ENGINE_ID,
         'num': 10,
-        'dateRestrict': 'y1'  # Freshness Filter (Last 1 Year)
+        'start': start,
+        'dateRestrict': DATE_RESTRICT
     }
     response = requests.get(url, params=params)
     return response.json()
 
+def get_cached_search(query, start):
+    try:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=CACHE_TTL_DAYS)).isoformat()
+        response = supabase.table("search_cache") \
+            .select("response") \
+            .eq("query", query) \
+            .eq("date_restrict", DATE_RESTRICT) \
+            .eq("start_index", start) \
+            .gte("fetched_at", cutoff) \
+            .execute()
+        return response.data[0]['response'] if response.data else None
+    except Exception:
+        return None
+
+def cached_google_search(query, start=1, budget=None, limiter=None):
+    """
+    google_search with a (query, dateRestrict, start) cache in Supabase.
+    Returns (results, from_cache). Errors are never cached.
+    Returns (None, False) once the run's query budget is used up.
+    """
+    cached = get_cached_search(query, start)
+    if cached is not None:
+        return cached, True
+
+    if budget and not budget.try_spend():
+        return None, False
+    if limiter:
+        limiter.wait()
+    results = google_search(query, start)
+    if 'error' not in results:
+        try:
+            supabase.table("search_cache").upsert({
+                "query": query,
+                "date_restrict": DATE_RESTRICT,
+                "start_index": start,
+                "response": results,
+                "fetched_at": datetime.now(timezone.utc).isoformat()
+            }, on_conflict="query,date_restrict,start_index").execute()
+        except Exception:
+            pass
+    return results, False
+
+def filter_new_items(items):
+    """Drops results whose URL is already in the scholarships table."""
+    links = [item.get('link') for item in items if item.get('link')]
+    if not links:
+        return []
+    try:
+        response = supabase.table("scholarships").select("url").in_("url", links).execute()
+        known = {row['url'] for row in response.data}
+    except Exception:
+        known = set()
+    return [item for item in items if item.get('link') and item.get('link') not in known]
+
+def hunt_query(query, budget=None, limiter=None, seen=None):
+    """
+    Runs one query, going deeper only while pages keep producing new URLs.
+    Returns (new scholarships saved, live CSE calls made).
+    """
+    saved = 0
+    live_calls = 0
+    start = 1
+    label = query[:50]
+    for page in range(MAX_PAGES):
+        results, from_cache = cached_google_search(query, start, budget, limiter)
+
+        if results is None:
+            print(f"   💸 [{label}] Query budget used up.")
+            break
+        if not from_cache:
+            live_calls += 1
+        if 'error' in results:
+            print(f"   ⚠️ [{label}] Google Error: {results['error']['message']}")
+            break
+        if 'items' not in results:
+            if page == 0:
+                print(f"   ⚠️ [{label}] No fresh results.")
+            break
+
+        items = results['items']
+        new_items = filter_new_items(items)
+        if seen:
+            new_items = seen.claim(new_items)  # Another worker may have just found the same URL
+        new_share = len(new_items) / len(items)
+        source = "💾 cache" if from_cache else "🌐 live"
+        print(f"   📄 [{label}] Page {page + 1} ({source}): {len(new_items)}/{len(items)} new")
+
+        saved += save_to_supabase(new_items, query)
+
+        next_page = results.get('queries', {}).get('nextPage')
+        if not next_page or new_share < DEEP_PAGE_NEW_SHARE:
+            break  # Mostly known URLs: deeper pages won't be worth the quota
+        start = next_page[0].get('startIndex', start + 10)
+    return saved, live_calls
+
 def save_to_supabase(items, source_query):
     count = 0
     for item in items:
@@ -131,34 +293,51 @@ def main():
     
     print(f"🎯 Targeting {len(topics)} topics using {len(dork_templates)} strategies.")
     
-    total_found = 0
-    
-    # 3. Hunt Loop
+    # 3. Expand every (topic, strategy) up front.
+    # Templates without {topic} render the same for every topic, so run them once.
+    query_topics = {}
     for topic in topics:
         # Try 3 random strategies per topic to save API quota
-        selected_dorks = random.sample(dork_templates, min(3, len(dork_templates)))
-        
+        selected_dorks = random.sample(dork_templates, min(DORKS_PER_TOPIC, len(dork_templates)))
         for template in selected_dorks:
-            query = template.format(topic=topic)
-            print(f"\n🔍 Hunting: {query}")
-            
-            try:
-                results = google_search(query)
-                
-                if 'items' in results:
-                    count = save_to_supabase(results['items'], query)
-                    total_found += count
-                elif 'error' in results:
-                    print(f"   ⚠️ Google Error: {results['error']['message']}")
-                else:
-                    print(f"   ⚠️ No fresh results.")
-                    
-                time.sleep(1) 
-                
-            except Exception as e:
-                print(f"   ❌ Critical Error: {e}")
-                
-    print(f"\n🏁 Mission Complete. Hunted {total_found} FRESH scholarships.")
+            query_topics.setdefault(template.format(topic=topic), []).append(topic)
+
+    print(f"🧮 {len(query_topics)} unique queries. Budget: {QUERY_BUDGET} live calls at {CSE_QPS} QPS.")
+
+    budget = QueryBudget(QUERY_BUDGET)
+    limiter = RateLimiter(CSE_QPS)
+    seen = SeenLinks()
+
+    def run(query):
+        if budget.exhausted:
+            return 0, 0, True  # Skipped; cached pages are still free but we stop cleanly
+        print(f"\n🔍 Hunting: {query}")
+        try:
+            saved, live_calls = hunt_query(query, budget, limiter, seen)
+            return saved, live_calls, False
+        except Exception as e:
+            print(f"   ❌ Critical Error: {e}")
+            return 0, 0, False
+
+    # 4. Hunt (bounded pool, paced by the shared rate limiter)
+    yields = {topic: {"found": 0, "queries": 0} for topic in topics}
+    total_found = 0
+    skipped = 0
+    with ThreadPoolExecutor(HUNT_WORKERS) as pool:
+        for query, (saved, live_calls, was_skipped) in zip(query_topics, pool.map(run, query_topics)):
+            skipped += was_skipped
+            total_found += saved
+            for topic in query_topics[query]:
+                yields[topic]["found"] += saved
+                yields[topic]["queries"] += live_calls
+
+    # 5. Report
+    print("\n📊 Yield per topic (new scholarships / live queries):")
+    for topic, stats in sorted(yields.items(), key=lambda kv: kv[1]["found"], reverse=True):
+        print(f"   {topic[:40]:<40} {stats['found']:>4} / {stats['queries']}")
+    if skipped:
+        print(f"💸 Budget reached: {skipped} queries skipped until the next run.")
+    print(f"\n🏁 Mission Complete. Hunted {total_found} FRESH scholarships using {budget.used} live queries.")
 
 if __name__ == "__main__":
     main()
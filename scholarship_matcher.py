@@ -1,7 +1,13 @@
 import os
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from gemini_errors import TRANSIENT_ERRORS
 
 # Load secrets
 load_dotenv()
@@ -14,6 +20,12 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 genai.configure(api_key=GEMINI_API_KEY)
 
+# Batch Mode Settings
+EMBED_BATCH_SIZE = 100  # embed_content accepts up to 100 texts per call
+LOOKUP_WORKERS = 8      # Parallel match_scholarships RPC calls
+EMBED_RETRIES = 5       # Attempts per batch before its profiles are skipped
+EMBED_BACKOFF = 4       # First cool-down in seconds, doubled after each failure
+
 def get_embedding(text):
     clean_text = text.replace("\n", " ")
     result = genai.embed_content(
@@ -23,6 +35,60 @@ def get_embedding(text):
     )
     return result['embedding']
 
+def get_embeddings(texts):
+    """
+    Embeds a list of profiles in ONE Gemini call (instead of one call each).
+    """
+    clean_texts = [text.replace("\n", " ") for text in texts]
+    result = genai.embed_content(
+        model="models/text-embedding-004",
+        content=clean_texts,
+        task_type="retrieval_query"
+    )
+    return result['embedding']
+
+def get_embeddings_with_retry(texts):
+    """
+    get_embeddings, cooling down (4s, 8s, 16s...) between failed attempts.
+    Only rate-limit and network errors are retried; anything else raises at once.
+    """
+    delay = EMBED_BACKOFF
+    for attempt in range(1, EMBED_RETRIES + 1):
+        try:
+            return get_embeddings(texts)
+        except TRANSIENT_ERRORS as e:
+            if attempt == EMBED_RETRIES:
+                raise
+            print(f"   ⚠️ Gemini Error (attempt {attempt}/{EMBED_RETRIES}): {e}")
+            print(f"   ⏳ Cooling down for {delay} seconds...")
+            time.sleep(delay)
+            delay *= 2
+
+def embed_profiles(batch):
+    """
+    One vector per profile, or None for a profile Gemini rejects.
+    A permanent error (e.g. one oversized profile) splits the batch in half
+    until the bad profile is alone, so the rest of the batch is still matched.
+    """
+    try:
+        return get_embeddings_with_retry([p["profile"] for p in batch])
+    except TRANSIENT_ERRORS:
+        raise
+    except Exception as e:
+        if len(batch) == 1:
+            print(f"   ⚠️ Gemini rejected profile {batch[0]['id']}: {e}")
+            return [None]
+        middle = len(batch) // 2
+        return embed_profiles(batch[:middle]) + embed_profiles(batch[middle:])
+
+def search_matches(query_vector, match_threshold=0.5, match_count=5):
+    response = supabase.rpc("match_scholarships", {
+        "query_embedding": query_vector,
+        "match_threshold": match_threshold,
+        "match_count": match_count
+    }).execute()
+    return response.data or []
+
 def find_matches(user_query):
     print(f"\n🔍 Analyzing Query: '{user_query}'")
     
@@ -36,13 +102,8 @@ def find_matches(user_query):
     # 2. Call the Supabase function (RPC)
     print("📡 Consulting the database...")
     try:
-        response = supabase.rpc("match_scholarships", {
-            "query_embedding": query_vector,
-            "match_threshold": 0.5, # Lower this if you get no results (e.g. 0.3)
-            "match_count": 5
-        }).execute()
-        
-        matches = response.data
+        # Lower the threshold if you get no results (e.g. 0.3)
+        matches = search_matches(query_vector, match_threshold=0.5, match_count=5)
         
         if not matches:
             print("⚠️ No strong matches found. Try a broader query.")
@@ -60,8 +121,145 @@ def find_matches(user_query):
     except Exception as e:
         print(f"❌ Database Error: {e}")
 
+# --- BATCH MODE (Overnight matching of many profiles) ---
+
+def read_profiles(path):
+    """
+    Streams profiles from a .jsonl or .csv file.
+    Each row needs a 'profile' field; 'id' is optional (defaults to row number).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for i, row in enumerate(rows):
+            text = (row.get("profile") or "").strip()
+            if text:
+                yield {"id": str(row.get("id") or i), "profile": text}
+
+def load_finished_ids(output_path):
+    """Reads an existing results file so a crashed run can resume where it stopped."""
+    if not os.path.exists(output_path):
+        return set()
+    finished = set()
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                finished.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue  # Half-written last line from a crash
+    return finished
+
+def trim_torn_line(output_path):
+    """Cuts a half-written last line, so resumed output starts on a fresh line."""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            if pos == end and chunk.endswith(b"\n"):
+                return  # Clean file
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(pos - step + newline + 1)
+                return
+            pos -= step
+        f.truncate(0)  # Not even one complete line
+
+def chunked(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def batch_match(input_path, output_path, match_threshold=0.5, match_count=5, snapshot=None):
+    print(f"🎓 HunterAI Batch Matcher: {input_path} -> {output_path}")
+    if snapshot:
+        print(f"🗂️ Using local snapshot ({len(snapshot)} scholarships), no database lookups.")
+
+    trim_torn_line(output_path)
+    finished = load_finished_ids(output_path)
+    if finished:
+        print(f"⏩ Resuming: {len(finished)} profiles already matched.")
+    pending = (p for p in read_profiles(input_path) if p["id"] not in finished)
+
+    def lookup(vector):
+        try:
+            if snapshot:
+                return snapshot.search(vector, match_threshold, match_count), None
+            return search_matches(vector, match_threshold, match_count), None
+        except Exception as e:
+            return None, str(e)
+
+    matched = failed = 0
+    start = time.time()
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(LOOKUP_WORKERS) as pool:
+        for batch in chunked(pending, EMBED_BATCH_SIZE):
+            # 1. One Gemini call for the whole batch (retried with backoff)
+            try:
+                vectors = embed_profiles(batch)
+            except Exception as e:
+                # Not written, so the next run retries these profiles
+                print(f"   ❌ Gemini Error (skipping {len(batch)} profiles): {e}")
+                failed += len(batch)
+                continue
+
+            # Profiles Gemini rejected are not written either
+            embedded = [(p, v) for p, v in zip(batch, vectors) if v is not None]
+            failed += len(batch) - len(embedded)
+
+            # 2. Top-k lookups run in parallel
+            results = pool.map(lookup, [v for _, v in embedded])
+            for (profile, _), (matches, error) in zip(embedded, results):
+                if error:
+                    # Not written, so the next run retries it
+                    print(f"   ⚠️ Database Error for {profile['id']}: {error}")
+                    failed += 1
+                    continue
+                out.write(json.dumps({
+                    "id": profile["id"],
+                    "matches": [
+                        {"id": m["id"], "title": m["title"], "url": m["url"], "similarity": m["similarity"]}
+                        for m in matches
+                    ]
+                }) + "\n")
+                matched += 1
+            out.flush()
+
+            elapsed = time.time() - start
+            print(f"   ✅ {matched} matched, {failed} failed ({matched / elapsed:.1f} profiles/sec)")
+
+    elapsed = time.time() - start
+    rate = matched / elapsed if elapsed else 0
+    print(f"\n🏁 Batch complete. {matched} profiles matched in {elapsed:.0f}s ({rate:.1f} profiles/sec).")
+
 if __name__ == "__main__":
-    # You can change this string to test different profiles!
-    print("🎓 Welcome to HunterAI Matcher")
-    user_input = input("Tell me about yourself (e.g., 'Ghanaian Civil Engineer looking for Masters'): ")
-    find_matches(user_input)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="HunterAI Matcher")
+    parser.add_argument("--batch", metavar="PROFILES", help="Match every profile in a .jsonl or .csv file")
+    parser.add_argument("--out", default="matches.jsonl", help="Where batch results are written (JSONL)")
+    parser.add_argument("--count", type=int, default=5, help="Matches per profile")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Minimum similarity")
+    parser.add_argument("--snapshot", metavar="DIR", help="Search a local catalogue snapshot instead of the database")
+    args = parser.parse_args()
+
+    if args.batch:
+        snapshot = None
+        if args.snapshot:
+            from catalogue_snapshot import CatalogueSnapshot
+            snapshot = CatalogueSnapshot.open(args.snapshot)
+        batch_match(args.batch, args.out, args.threshold, args.count, snapshot)
+    else:
+        # You can change this string to test different profiles!
+        print("🎓 Welcome to HunterAI Matcher")
+        user_input = input("Tell me about yourself (e.g., 'Ghanaian Civil Engineer looking for Masters'): ")
+        find_matches(user_input)
\ No newline at end of file
@@ -0,0 +1,141 @@
+import os
+import re
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Cheap local scoring between the Scraper and the Embedder.
+# Cookie walls, soft-404s, login pages and failed PDF reads get is_junk = true
+# and are never sent to Gemini (see claim_scholarships in sql/work_queue.sql).
+
+MIN_CHARS = 300       # Shorter than this is never a real scholarship page
+GOOD_CHARS = 2000     # Length at which the length score maxes out
+JUNK_THRESHOLD = 0.45
+
+# Phrases that mean "this is not the page you wanted" (checked near the top)
+JUNK_SIGNATURES = [
+    "error reading pdf", "page not found", "404 not found", "404 error", "403 forbidden",
+    "access denied", "this page doesn't exist", "this page does not exist",
+    "page you requested could not be found", "enable javascript", "javascript is disabled",
+    "please enable cookies", "checking your browser", "just a moment...", "verify you are human",
+    "captcha", "sign in to continue", "log in to continue", "please log in", "session has expired"
+]
+SIGNATURE_WINDOW = 600  # Only the start of the page: real pages mention "login" in footers
+
+SCHOLARSHIP_KEYWORDS = [
+    "scholarship", "fellowship", "funding", "grant", "bursary", "tuition", "stipend",
+    "eligib", "applicant", "application", "deadline", "award", "postgraduate",
+    "undergraduate", "master", "phd", "doctoral", "degree", "university"
+]
+BOILERPLATE_PHRASES = [
+    "cookie", "privacy policy", "terms of use", "terms and conditions", "all rights reserved",
+    "subscribe", "newsletter", "sign in", "log in", "skip to content", "copyright", "follow us"
+]
+ENGLISH_STOPWORDS = {
+    "the", "and", "of", "to", "in", "for", "is", "are", "a", "an", "with", "on", "be",
+    "this", "that", "you", "will", "or", "by", "as", "at", "from", "your", "must"
+}
+
+WORD_RE = re.compile(r"[a-z]+")
+
+def assess(text):
+    """
+    Returns {"score": 0..1, "is_junk": bool, "reasons": [...]}.
+    Pure string work, ~1 ms per page.
+    """
+    if not text or len(text.strip()) < MIN_CHARS:
+        return {"score": 0.0, "is_junk": True, "reasons": ["too short"]}
+
+    lower = text.lower()
+    head = lower[:SIGNATURE_WINDOW]
+    for signature in JUNK_SIGNATURES:
+        if signature in head:
+            return {"score": 0.0, "is_junk": True, "reasons": [f"signature: {signature}"]}
+
+    words = WORD_RE.findall(lower)
+    total = max(len(words), 1)
+    per_1k = 1000 / total
+    reasons = []
+
+    length_score = min(len(text) / GOOD_CHARS, 1.0)
+
+    keyword_hits = sum(lower.count(k) for k in SCHOLARSHIP_KEYWORDS) * per_1k
+    if keyword_hits == 0:
+        # Length and clean markup alone must never be enough to pass
+        return {"score": 0.0, "is_junk": True, "reasons": ["no scholarship keywords"]}
+    keyword_score = min(keyword_hits / 10, 1.0)  # 10 hits per 1k words = clearly on topic
+
+    boilerplate_hits = sum(lower.count(p) for p in BOILERPLATE_PHRASES) * per_1k
+    boilerplate_score = max(1.0 - boilerplate_hits / 30, 0.0)
+    if boilerplate_score < 0.5:
+        reasons.append("mostly boilerplate")
+
+    # The embedding model is English-first; other languages rank poorly anyway
+    stopword_ratio = sum(1 for w in words if w in ENGLISH_STOPWORDS) / total
+    language_score = min(stopword_ratio / 0.15, 1.0)
+    if language_score < 0.3:
+        reasons.append("probably not English")
+
+    score = 0.3 * length_score + 0.35 * keyword_score + 0.2 * boilerplate_score + 0.15 * language_score
+    return {"score": round(score, 3), "is_junk": score < JUNK_THRESHOLD, "reasons": reasons}
+
+def main(supabase, page_size=200):
+    print("🧪 Quality Filter: Scoring scraped pages before embedding...")
+
+    scored = junk = chars_saved = 0
+    failed = set()  # Rows we couldn't update this run; skipped so the loop always ends
+    while True:
+        # Rows that will be embedded next and haven't been scored yet
+        try:
+            query = supabase.table("scholarships") \
+                .select("id, title, full_text") \
+                .not_.is_("full_text", "null") \
+                .is_("embedding", "null") \
+                .is_("quality_score", "null")
+            if failed:
+                query = query.not_.in_("id", list(failed))
+            rows = query.limit(page_size).execute().data
+        except Exception as e:
+            print(f"   ❌ DB Error: {e}")
+            break
+        if not rows:
+            break
+
+        progress = 0
+        for row in rows:
+            result = assess(row['full_text'])
+            try:
+                response = supabase.table("scholarships") \
+                    .update({"quality_score": result["score"], "is_junk": result["is_junk"]}) \
+                    .eq("id", row['id']) \
+                    .execute()
+            except Exception as e:
+                print(f"   ⚠️ DB Error: {e}")
+                failed.add(row['id'])
+                continue
+            if not response.data:
+                failed.add(row['id'])  # Updated nothing (row gone or not writable)
+                continue
+            progress += 1
+            scored += 1
+            if result["is_junk"]:
+                junk += 1
+                chars_saved += len(row['full_text'])
+                print(f"   🚫 {(row['title'] or '')[:40]}... ({', '.join(result['reasons']) or 'low score'})")
+
+        if not progress:
+            break  # A whole page failed: the database is unhappy, leave the rest for next run
+
+    print(f"\n📊 Scored {scored} pages. Flagged {junk} as junk.")
+    if failed:
+        print(f"⚠️ {len(failed)} pages could not be scored (the embedder scores them as a backstop).")
+    print(f"💰 Saved {junk} embedding calls this run (~{chars_saved:,} chars not sent to Gemini).")
+
+    try:
+        total = supabase.table("scholarships").select("id", count="exact").eq("is_junk", True).execute().count
+        print(f"🧾 {total} junk pages blocked in total.")
+    except Exception:
+        pass
+
+if __name__ == "__main__":
+    load_dotenv()
+    main(create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")))
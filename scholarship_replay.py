@@ -0,0 +1,70 @@
+import os
+import json
+import time
+import argparse
+from datetime import datetime
+from http_archive import HttpArchive
+from scholarship_extractor import extract_content, find_deadline, ExtractionPool
+
+# Re-runs extraction + deadline detection over an archive made with
+# `scholarship_scraper.py --archive DIR`. Zero network I/O, so changes to the
+# extraction logic can be tested (and benchmarked) against the whole corpus.
+
+def replay_entry(root, entry):
+    body = HttpArchive(root).get_body(entry["sha256"])
+    headers = {k.lower(): v for k, v in entry["headers"].items()}
+    content_type = headers.get("content-type", "")
+
+    content = extract_content(body, content_type, entry["url"])
+    deadline = find_deadline(content) if content else None
+
+    return {
+        "url": entry["url"],
+        "sha256": entry["sha256"],
+        "chars": len(content) if content else 0,
+        "deadline": deadline.strftime("%Y-%m-%d") if deadline else None,
+        "is_active": not deadline or deadline >= datetime.now()
+    }
+
+def replay(root, output_path=None, workers=None):
+    entries = HttpArchive(root).entries()
+    if not entries:
+        print(f"⚠️ Archive {root} is empty.")
+        return []
+
+    workers = workers or os.cpu_count()
+    print(f"⏪ Replaying {len(entries)} archived pages on {workers} processes...")
+
+    start = time.time()
+    results = []
+    with ExtractionPool(workers) as pool:
+        futures = {pool.submit(replay_entry, root, entry): entry for entry in entries}
+        for future, result in pool.results(futures):
+            if result is None:
+                # Timed out, ran out of memory or crashed its worker
+                entry = futures[future]
+                result = {"url": entry["url"], "sha256": entry["sha256"], "chars": 0,
+                          "deadline": None, "is_active": True, "failed": True}
+            results.append(result)
+    elapsed = time.time() - start
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+    readable = sum(1 for r in results if r["chars"])
+    dated = sum(1 for r in results if r["deadline"])
+    expired = sum(1 for r in results if not r["is_active"])
+    failed = sum(1 for r in results if r.get("failed"))
+    print(f"📖 Readable: {readable}/{len(results)} | 📅 Deadlines: {dated} | ❌ Expired: {expired} | 💥 Failed: {failed}")
+    print(f"🏁 {elapsed:.1f}s ({len(results) / elapsed:.1f} pages/sec)")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay archived pages through the extractor")
+    parser.add_argument("archive", help="Archive directory written by the scraper")
+    parser.add_argument("--out", help="Write per-page results to this JSONL file")
+    parser.add_argument("--workers", type=int, help="Processes to use (default: all cores)")
+    args = parser.parse_args()
+    replay(args.archive, args.out, args.workers)
@@ -1,14 +1,14 @@
 import os
-import time
 import requests
-import io
+import argparse
 from datetime import datetime
-from bs4 import BeautifulSoup
-from pypdf import PdfReader
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from fake_useragent import UserAgent
-import dateparser # The Date Reader
+from scholarship_extractor import extract_document, is_pdf, ExtractionPool
+from http_archive import HttpArchive
+from work_queue import make_worker_id, claim_batch, complete
 
 # Load environment variables
 load_dotenv()
@@ -18,129 +18,110 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 ua = UserAgent()
+WORKER_ID = make_worker_id("scrape")
+FETCH_WORKERS = 8  # Parallel downloads (network-bound, so threads)
 
-def extract_text_from_pdf(pdf_bytes):
-    try:
-        text = ""
-        reader = PdfReader(io.BytesIO(pdf_bytes))
-        for i, page in enumerate(reader.pages):
-            if i > 5: break 
-            text += page.extract_text() + "\n"
-        return text
-    except Exception:
-        return None
-
-def find_deadline(text):
-    """
-    Scans text for dates near keywords like 'Deadline'
-    """
-    if not text: return None
-    
-    # Keywords to look for
-    keywords = ["deadline", "closing date", "due date", "closes on", "applications close"]
-    text_lower = text.lower()
-    
-    for word in keywords:
-        if word in text_lower:
-            try:
-                # Find the keyword position
-                start = text_lower.find(word)
-                # Grab a snippet of text AFTER the keyword (e.g., "Deadline: Jan 5")
-                # We grab 50 chars to be safe
-                snippet = text[start:start+60]
-                
-                # Ask dateparser to find a date in that mess
-                found_date = dateparser.parse(
-                    snippet, 
-                    settings={'PREFER_DATES_FROM': 'future', 'DATE_ORDER': 'DMY'}
-                )
-                
-                if found_date:
-                    return found_date
-            except:
-                continue
-    return None
-
-def get_page_content(url):
+def fetch_page(url, archive=None):
+    """Network only: returns (body, content_type) or None."""
     try:
         headers = {'User-Agent': ua.random}
         response = requests.get(url, headers=headers, timeout=15)
         
-        content_type = response.headers.get('Content-Type', '').lower()
-        
-        if 'pdf' in content_type or url.endswith('.pdf'):
-            print("      📄 Detected PDF...")
-            return extract_text_from_pdf(response.content)
-        else:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            for script in soup(["script", "style", "nav", "footer"]):
-                script.decompose()
-            return ' '.join(soup.get_text(separator=' ').split())
+        if archive:
+            # Keep the raw bytes so extraction can be replayed without the network.
+            # An archive problem must not fail a page that downloaded fine.
+            try:
+                archive.put(url, response.status_code, dict(response.headers), response.content)
+            except Exception as e:
+                print(f"      ⚠️ Could not archive {url}: {e}")
+
+        return response.content, response.headers.get('Content-Type', '').lower()
 
     except Exception:
         return None
 
-def main():
-    print("🕷️  Scraper (with Expiration Guard) Initialized...")
-    
-    # 1. Fetch unread items (Limit 50 to clear backlog faster)
-    response = supabase.table("scholarships") \
-        .select("id, url, title") \
-        .is_("full_text", "null") \
-        .limit(50) \
-        .execute()
-        
-    tasks = response.data
-    
-    if not tasks:
-        print("✅ No unread scholarships found.")
-        return
+def main(drain=False, archive=None):
+    print(f"🕷️  Scraper (with Expiration Guard) Initialized as {WORKER_ID}...")
 
-    print(f"📚 Found {len(tasks)} unread scholarships...")
+    while True:
+        # 1. Claim unread items (Limit 50 to clear backlog faster)
+        # The lease stops other scraper workers from reading the same rows
+        tasks = claim_batch(supabase, "scrape", WORKER_ID, limit=50)
 
-    for item in tasks:
-        print(f"\n📖 Reading: {item['title'][:40]}...")
-        content = get_page_content(item['url'])
+        if not tasks:
+            print("✅ No unread scholarships found.")
+            return
+
+        print(f"📚 Claimed {len(tasks)} unread scholarships...")
+        process_batch(tasks, archive)
+
+        if not drain:
+            return
+
+def process_batch(tasks, archive=None):
+    with ExtractionPool() as extractor, ThreadPoolExecutor(FETCH_WORKERS) as fetchers:
+        # Stage 1: Download (threads). Each page goes to the extractors as soon as it lands.
+        fetches = {fetchers.submit(fetch_page, item['url'], archive): item for item in tasks}
+        extractions = {}
+
+        for future in as_completed(fetches):
+            item = fetches[future]
+            page = future.result()
+            if not page:
+                save_result(item, None, None)
+                continue
+            body, content_type = page
+            if is_pdf(content_type, item['url']):
+                print(f"      📄 Detected PDF: {item['title'][:40]}...")
+            extractions[extractor.submit(extract_document, body, content_type, item['url'])] = item
+
+        # Stage 2: Extract (processes). Slow or broken documents only hold up their own worker.
+        for future, result in extractor.results(extractions):
+            content, deadline = result or (None, None)
+            save_result(extractions[future], content, deadline)
+
+def save_result(item, content, deadline):
+    print(f"\n📖 Read: {item['title'][:40]}...")
+
+    if content:
+        # --- EXPIRATION CHECK ---
+        is_active = True
+        deadline_str = None
         
-        if content:
-            # --- EXPIRATION CHECK ---
-            deadline = find_deadline(content)
-            is_active = True
-            deadline_str = None
-            
-            if deadline:
-                deadline_str = deadline.strftime("%Y-%m-%d")
-                # If deadline is in the past (and not today), it's expired
-                if deadline < datetime.now():
-                    print(f"      ❌ EXPIRED! (Deadline was {deadline_str})")
-                    is_active = False 
-                else:
-                    print(f"      ✅ Active! (Deadline: {deadline_str})")
+        if deadline:
+            deadline_str = deadline.strftime("%Y-%m-%d")
+            # If deadline is in the past (and not today), it's expired
+            if deadline < datetime.now():
+                print(f"      ❌ EXPIRED! (Deadline was {deadline_str})")
+                is_active = False 
             else:
-                print("      ⚠️  No specific deadline found (Keeping as Active).")
-
-            # Update Database
-            try:
-                # Truncate to save space
-                truncated_content = content[:15000]
-                
-                supabase.table("scholarships") \
-                    .update({
-                        "full_text": truncated_content, 
-                        "is_processed": True,
-                        "is_active": is_active,
-                        "deadline": deadline_str
-                    }) \
-                    .eq("id", item['id']) \
-                    .execute()
-            except Exception as e:
-                print(f"   ⚠️ DB Error: {e}")
+                print(f"      ✅ Active! (Deadline: {deadline_str})")
         else:
-            # If we can't read it, mark processed so we don't retry forever
-            print("      ⚠️  Failed to read.")
-            supabase.table("scholarships").update({"is_processed": True}).eq("id", item['id']).execute()
+            print("      ⚠️  No specific deadline found (Keeping as Active).")
+
+        # Update Database
+        try:
+            # Truncate to save space
+            truncated_content = content[:15000]
             
-        time.sleep(1)
+            saved = complete(supabase, item['id'], WORKER_ID, {
+                "full_text": truncated_content, 
+                "is_processed": True,
+                "is_active": is_active,
+                "deadline": deadline_str
+            })
+            if not saved:
+                print("   ⚠️ Lease lost (another worker took over).")
+        except Exception as e:
+            print(f"   ⚠️ DB Error: {e}")
+    else:
+        # If we can't read it, release it. The attempt counter stops endless retries.
+        print("      ⚠️  Failed to read.")
+        complete(supabase, item['id'], WORKER_ID, {"is_processed": True})
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="HunterAI Scraper")
+    parser.add_argument("--drain", action="store_true", help="Keep claiming batches until the queue is empty")
+    parser.add_argument("--archive", metavar="DIR", help="Also save raw responses to this archive (see scholarship_replay.py)")
+    args = parser.parse_args()
+    main(drain=args.drain, archive=HttpArchive(args.archive) if args.archive else None)
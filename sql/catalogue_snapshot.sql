@@ -0,0 +1,31 @@
+-- Watermark for incremental catalogue snapshots (catalogue_snapshot.py).
+-- Run once in the Supabase SQL editor.
+--
+-- embedded_at is stamped by the database whenever a vector is written, so
+-- every embedder shares one clock. A refresh only has to download rows
+-- embedded since the previous snapshot (minus an overlap window for rows
+-- that committed late).
+
+alter table scholarships
+    add column if not exists embedded_at timestamptz;
+
+create index if not exists scholarships_embedded_at_idx
+    on scholarships (embedded_at);
+
+create or replace function stamp_embedded_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.embedding is not null
+       and (tg_op = 'INSERT' or new.embedding is distinct from old.embedding) then
+        new.embedded_at := clock_timestamp();
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists scholarships_stamp_embedded_at on scholarships;
+create trigger scholarships_stamp_embedded_at
+    before insert or update of embedding on scholarships
+    for each row execute function stamp_embedded_at();
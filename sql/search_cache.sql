@@ -0,0 +1,14 @@
+-- Cache of Google Custom Search responses, used by scholarship_hunter.py.
+-- Run once in the Supabase SQL editor.
+--
+-- One row per (query, dateRestrict, start). Rows older than the hunter's
+-- TTL are refreshed on the next hunt, so repeat queries cost no quota.
+
+create table if not exists search_cache (
+    query         text not null,
+    date_restrict text not null,
+    start_index   int  not null default 1,
+    response      jsonb not null,
+    fetched_at    timestamptz not null default now(),
+    primary key (query, date_restrict, start_index)
+);
@@ -0,0 +1,26 @@
+-- Saved profiles and their incrementally maintained top-k matches.
+-- Run once in the Supabase SQL editor (after pgvector is enabled).
+--
+-- The embedder scores each batch of NEW scholarship vectors against every
+-- saved profile (standing_matches.py), so the daily cost is
+-- new scholarships x profiles instead of the whole table x profiles.
+
+create table if not exists saved_profiles (
+    id           bigint generated by default as identity primary key,
+    name         text not null,
+    profile_text text not null,
+    embedding    vector(768) not null,
+    created_at   timestamptz not null default now(),
+    last_seen_at timestamptz not null default now()
+);
+
+create table if not exists profile_matches (
+    profile_id     bigint not null references saved_profiles (id) on delete cascade,
+    scholarship_id bigint not null references scholarships (id) on delete cascade,
+    similarity     real not null,
+    matched_at     timestamptz not null default now(),
+    primary key (profile_id, scholarship_id)
+);
+
+create index if not exists profile_matches_recent_idx
+    on profile_matches (profile_id, matched_at desc);
@@ -0,0 +1,59 @@
+-- Lease-based work queue for the scraper and embedder.
+-- Run once in the Supabase SQL editor.
+--
+-- A worker "claims" a batch: the rows get its worker id and a lease expiry.
+-- Other workers skip leased rows (FOR UPDATE SKIP LOCKED), so N workers never
+-- process the same row. If a worker dies, its lease expires and the rows go
+-- back to the queue. Attempts are counted per stage so poison rows stop
+-- being retried after p_max_attempts.
+
+alter table scholarships
+    add column if not exists lease_owner text,
+    add column if not exists lease_expires_at timestamptz,
+    add column if not exists scrape_attempts int not null default 0,
+    add column if not exists embed_attempts int not null default 0;
+
+-- Set by scholarship_quality_filter.py. Junk rows are never embedded.
+alter table scholarships
+    add column if not exists quality_score real,
+    add column if not exists is_junk boolean not null default false;
+
+create index if not exists scholarships_lease_expires_idx
+    on scholarships (lease_expires_at);
+
+create or replace function claim_scholarships(
+    p_stage text,
+    p_worker_id text,
+    p_limit int default 50,
+    p_lease_seconds int default 1800,
+    p_max_attempts int default 3
+)
+returns setof scholarships
+language sql
+as $$
+    with picked as (
+        select s.id
+        from scholarships s
+        where (s.lease_expires_at is null or s.lease_expires_at < now())
+          and case p_stage
+                when 'scrape' then s.full_text is null
+                                   and s.scrape_attempts < p_max_attempts
+                when 'embed'  then s.embedding is null
+                                   and s.full_text is not null
+                                   and not s.is_junk
+                                   and s.embed_attempts < p_max_attempts
+                else false
+              end
+        order by s.id
+        limit p_limit
+        for update skip locked
+    )
+    update scholarships s
+    set lease_owner      = p_worker_id,
+        lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+        scrape_attempts  = s.scrape_attempts + (p_stage = 'scrape')::int,
+        embed_attempts   = s.embed_attempts + (p_stage = 'embed')::int
+    from picked
+    where s.id = picked.id
+    returning s.*;
+$$;
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+import numpy as np
+from embedding_store import parse_vector
+
+# "New matches since last visit" for saved profiles.
+# Profiles are embedded once. Each time the embedder writes new scholarship
+# vectors, only those vectors are scored against the profiles and each
+# profile's top-k list is merged. Needs sql/standing_matches.sql.
+
+TOP_K = 20
+MATCH_THRESHOLD = 0.5
+PAGE_SIZE = 1000        # PostgREST max-rows: longer reads are cut off silently
+PROFILE_CHUNK = 200     # Profile ids per in_() filter, keeps the URL short
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def _fetch_pages(query_fn):
+    start = 0
+    while True:
+        rows = query_fn().range(start, start + PAGE_SIZE - 1).execute().data
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        start += PAGE_SIZE
+
+def _normalise(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+def save_profile(supabase, name, profile_text, embedding, seed_matches=()):
+    """
+    Stores a profile and its starting top-k (e.g. the match_scholarships results
+    the user is looking at). Returns the new profile id.
+    """
+    response = supabase.table("saved_profiles").insert({
+        "name": name,
+        "profile_text": profile_text,
+        "embedding": embedding
+    }).execute()
+    profile_id = response.data[0]['id']
+    seen_at = response.data[0]['last_seen_at']  # Seeds are not "new"
+
+    rows = [
+        {"profile_id": profile_id, "scholarship_id": m['id'], "similarity": m['similarity'], "matched_at": seen_at}
+        for m in list(seed_matches)[:TOP_K]
+    ]
+    if rows:
+        supabase.table("profile_matches").insert(rows).execute()
+    return profile_id
+
+def update_standing_matches(supabase, new_vectors):
+    """
+    new_vectors: [(scholarship_id, embedding), ...] just written by the embedder.
+    Merges them into every profile's top-k. Returns the number of new matches.
+    """
+    if not new_vectors:
+        return 0
+
+    profiles = list(_fetch_pages(
+        lambda: supabase.table("saved_profiles").select("id, embedding").order("id")
+    ))
+    if not profiles:
+        return 0
+
+    profile_ids = [p['id'] for p in profiles]
+    scholarship_ids = [sid for sid, _ in new_vectors]
+
+    # profiles x new scholarships, one matrix multiply
+    scores = _normalise([parse_vector(p['embedding']) for p in profiles]) @ \
+        _normalise([vector for _, vector in new_vectors]).T
+
+    candidates = {}
+    for p, s in zip(*np.nonzero(scores >= MATCH_THRESHOLD)):
+        candidates.setdefault(profile_ids[p], []).append((scholarship_ids[s], float(scores[p, s])))
+    if not candidates:
+        return 0
+
+    # Current lists of the affected profiles, all of them: a missing row would look "new"
+    current = {}
+    affected = list(candidates)
+    for i in range(0, len(affected), PROFILE_CHUNK):
+        chunk = affected[i:i + PROFILE_CHUNK]
+        rows = _fetch_pages(
+            lambda: supabase.table("profile_matches")
+                .select("profile_id, scholarship_id, similarity, matched_at")
+                .in_("profile_id", chunk)
+                .order("profile_id")
+                .order("scholarship_id")
+        )
+        for row in rows:
+            current.setdefault(row['profile_id'], {})[row['scholarship_id']] = row
+
+    upserts, evicted = [], {}
+    added = 0
+    now = _now()
+    for profile_id, found in candidates.items():
+        existing = current.get(profile_id, {})
+        merged = {sid: row['similarity'] for sid, row in existing.items()}
+        merged.update(found)
+        keep = set(sorted(merged, key=merged.get, reverse=True)[:TOP_K])
+
+        for scholarship_id, similarity in found:
+            if scholarship_id in keep:
+                # A re-embedded scholarship that was already listed is not "new"
+                known = existing.get(scholarship_id)
+                upserts.append({
+                    "profile_id": profile_id,
+                    "scholarship_id": scholarship_id,
+                    "similarity": similarity,
+                    "matched_at": known['matched_at'] if known else now
+                })
+                added += not known
+        dropped = [sid for sid in existing if sid not in keep]
+        if dropped:
+            evicted[profile_id] = dropped
+
+    if upserts:
+        supabase.table("profile_matches").upsert(upserts, on_conflict="profile_id,scholarship_id").execute()
+    for profile_id, scholarship_ids in evicted.items():
+        supabase.table("profile_matches") \
+            .delete() \
+            .eq("profile_id", profile_id) \
+            .in_("scholarship_id", scholarship_ids) \
+            .execute()
+    return added
+
+def get_profiles(supabase):
+    return list(_fetch_pages(
+        lambda: supabase.table("saved_profiles").select("id, name, last_seen_at").order("created_at").order("id")
+    ))
+
+def get_new_matches(supabase, profile_id, since):
+    """Matches added after `since` (the profile's last_seen_at), best first."""
+    return supabase.table("profile_matches") \
+        .select("similarity, matched_at, scholarships (id, title, url, content_snippet)") \
+        .eq("profile_id", profile_id) \
+        .gt("matched_at", since) \
+        .order("similarity", desc=True) \
+        .execute().data
+
+def mark_seen(supabase, profile_id):
+    supabase.table("saved_profiles").update({"last_seen_at": _now()}).eq("id", profile_id).execute()
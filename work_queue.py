@@ -0,0 +1,52 @@
+import os
+import socket
+
+# Lease-based claiming so several scrapers/embedders can run at once.
+# Needs the claim_scholarships function from sql/work_queue.sql.
+
+LEASE_SECONDS = 1800  # Long enough for a 50-item batch with slow pages
+MAX_ATTEMPTS = 3      # After this many claims a row is left alone
+
+def make_worker_id(stage):
+    """Unique per process, e.g. 'scrape-runner-12-4821'. Override with WORKER_ID."""
+    return os.getenv("WORKER_ID") or f"{stage}-{socket.gethostname()}-{os.getpid()}"
+
+def claim_batch(supabase, stage, worker_id, limit=50, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """
+    Atomically leases up to `limit` rows for `stage` ('scrape' or 'embed').
+    Rows leased by another live worker are skipped; expired leases are reclaimed.
+    """
+    response = supabase.rpc("claim_scholarships", {
+        "p_stage": stage,
+        "p_worker_id": worker_id,
+        "p_limit": limit,
+        "p_lease_seconds": lease_seconds,
+        "p_max_attempts": max_attempts
+    }).execute()
+    return response.data or []
+
+def complete(supabase, scholarship_id, worker_id, updates):
+    """
+    Saves the result and frees the lease in one update.
+    Returns False if our lease expired and another worker took the row.
+    """
+    data = dict(updates, lease_owner=None, lease_expires_at=None)
+    response = supabase.table("scholarships") \
+        .update(data) \
+        .eq("id", scholarship_id) \
+        .eq("lease_owner", worker_id) \
+        .execute()
+    return bool(response.data)
+
+def release(supabase, scholarship_id, worker_id):
+    """Gives the row back to the queue now (the attempt still counts)."""
+    return complete(supabase, scholarship_id, worker_id, {})
+
+def requeue(supabase, item, stage, worker_id):
+    """
+    Gives the row back WITHOUT counting this attempt.
+    For failures that aren't the row's fault (rate limits, network errors).
+    `item` is the row returned by claim_batch.
+    """
+    column = f"{stage}_attempts"
+    return complete(supabase, item['id'], worker_id, {column: max(item.get(column, 1) - 1, 0)})